@@ -17,21 +17,194 @@ Security note:
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import sqlite3
+import csv
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from pathlib import Path
 from datetime import date, datetime
 
 DB = "erp_credentials_erp.db"
+IMPORT_CHUNK = 1000  # rows per executemany batch for bulk imports
+PAGE_SIZE = 500      # rows per page in the admin Attendance / Marks tabs
+CRED_PAGE_SIZE = 200  # rows per page in the admin Credentials tab
+REFRESH_DEBOUNCE_MS = 80  # changes within this window share one refresh
+STUDENT_POLL_MS = 30000  # how often an open student dashboard checks for new data
+STATS_DRIFT = 2  # re-ANALYZE a table once its row count is off from sqlite_stat1 by this factor
 
 # ---------- Database helpers ----------
-def get_conn():
-    conn = sqlite3.connect(DB)
+_CONN = None
+
+def _tune(conn):
+    # per-connection settings; journal_mode=WAL is stored in the db file and set by get_conn()
     conn.row_factory = sqlite3.Row
+    conn.executescript("""
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;  -- 64 MiB per connection
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+    """)
     return conn
 
+def get_conn():
+    # one long-lived connection for the whole app; keeps SQLite's page cache warm
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB, check_same_thread=False, cached_statements=256)
+        # WAL + NORMAL sync: commits append to the log instead of fsyncing the main db
+        _CONN.execute("PRAGMA journal_mode=WAL")
+        _tune(_CONN)
+    return _CONN
+
+class ConnectionPool:
+    """Read-only connections shared by the UI and worker threads; WAL lets them read while get_conn() writes.
+
+    acquire() hands out an idle connection (opening one while fewer than maxsize exist)
+    and puts it back on exit instead of closing it.
+    """
+    def __init__(self, minsize=2, maxsize=8):
+        self.minsize = minsize
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def _open(self):
+        uri = Path(DB).resolve().as_uri() + "?mode=ro"
+        return _tune(sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=256))
+
+    def open(self):
+        # pre-open the minimum once the db file exists (called after init_db)
+        while self._idle.qsize() < self.minsize:
+            self._idle.put(self._open())
+
+    @contextmanager
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+READ_POOL = ConnectionPool()
+
+def stream(cur):
+    # yield a cursor's rows arraysize at a time, without materialising them all with fetchall()
+    while batch := cur.fetchmany():
+        yield from batch
+
+def fetch_rows(sql, params=()):
+    # plain tuples: every caller reads these positionally (DataTree.sync, probes)
+    with READ_POOL.acquire() as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur.execute(sql, params).fetchall()
+
+@contextmanager
+def read_txn(conn):
+    # one explicit BEGIN/COMMIT around a batch of SELECTs: one shared lock, one schema check
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.commit()
+
+# pure link table: the composite key is the clustered index, no rowid indirection
+ASSIGNMENTS_DDL = """
+    CREATE TABLE IF NOT EXISTS assignments (
+        teacher_id INTEGER,
+        subject_id INTEGER,
+        PRIMARY KEY(teacher_id, subject_id),
+        FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id),
+        FOREIGN KEY(subject_id) REFERENCES subjects(subject_id)
+    ) WITHOUT ROWID
+"""
+
+def migrate_assignments(conn):
+    # Rebuild an older assignments(id, ...) table as ASSIGNMENTS_DDL, or finish a rebuild an earlier
+    # start left in assignments_old. Pairs whose teacher or subject no longer exists are kept in
+    # assignments_old rather than discarded; returns a message about them, or None.
+    cols = [c["name"] for c in conn.execute("PRAGMA table_info(assignments)").fetchall()]
+    leftover = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='assignments_old'").fetchone()
+    if "id" not in cols and not leftover:
+        return None
+    # one transaction: if the app dies part-way the next start finds the database as it was
+    with conn:
+        conn.execute("BEGIN")
+        if "id" in cols:
+            conn.execute("ALTER TABLE assignments RENAME TO assignments_old")
+            conn.execute(ASSIGNMENTS_DDL)
+        # duplicates collapse into one row; the copied rows leave assignments_old
+        conn.execute("""
+            INSERT OR IGNORE INTO assignments (teacher_id, subject_id)
+            SELECT teacher_id, subject_id FROM assignments_old
+            WHERE teacher_id IN (SELECT teacher_id FROM teachers)
+              AND subject_id IN (SELECT subject_id FROM subjects)""")
+        conn.execute("""
+            DELETE FROM assignments_old
+            WHERE teacher_id IN (SELECT teacher_id FROM teachers)
+              AND subject_id IN (SELECT subject_id FROM subjects)""")
+        left = conn.execute("SELECT COUNT(*) FROM assignments_old").fetchone()[0]
+        if not left:
+            conn.execute("DROP TABLE assignments_old")
+    if left:
+        return (f"{left} teacher assignment(s) refer to a teacher or subject that no longer exists "
+                "and were not carried over. They are kept in the assignments_old table.")
+    return None
+
+def dedupe_attendance(conn):
+    # Before uq_att exists there can be several rows per student/subject/day. The newest one stays;
+    # the older ones are moved (not deleted) to attendance_duplicates. Returns a message, or None.
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='attendance'").fetchone():
+        return None
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='uq_att'").fetchone():
+        return None
+    older = """FROM attendance WHERE attendance_id NOT IN
+               (SELECT MAX(attendance_id) FROM attendance GROUP BY student_id, subject_id, date)"""
+    moved = conn.execute("SELECT COUNT(*) " + older).fetchone()[0]
+    if not moved:
+        return None
+    with conn:
+        conn.execute("BEGIN")
+        conn.execute("CREATE TABLE IF NOT EXISTS attendance_duplicates AS SELECT * FROM attendance WHERE 0")
+        conn.execute("INSERT INTO attendance_duplicates SELECT * " + older)
+        conn.execute("DELETE " + older)
+    return (f"{moved} older duplicate attendance record(s) (same student, subject and day) were found. "
+            "The newest record of each day was kept; the older ones were moved to the "
+            "attendance_duplicates table.")
+
 def init_db():
     conn = get_conn()
     cur = conn.cursor()
+    warnings = []
+    # older databases may hold duplicate attendance rows, which uq_att below would refuse
+    warning = dedupe_attendance(conn)
+    if warning:
+        warnings.append(warning)
+    # older databases have assignments(id, ...) with a rowid; rebuild it as the keyed link table
+    warning = migrate_assignments(conn)
+    if warning:
+        warnings.append(warning)
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='marks_latest'")
+    backfill_marks = cur.fetchone() is None
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_att_stud_date'")
+    new_indexes = cur.fetchone() is None
     cur.executescript("""
     -- Users table stores login credentials for admin/teacher/student
     CREATE TABLE IF NOT EXISTS users (
@@ -65,14 +238,6 @@ def init_db():
         subject_code TEXT UNIQUE
     );
 
-    CREATE TABLE IF NOT EXISTS assignments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        teacher_id INTEGER,
-        subject_id INTEGER,
-        FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id),
-        FOREIGN KEY(subject_id) REFERENCES subjects(subject_id)
-    );
-
     CREATE TABLE IF NOT EXISTS attendance (
         attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
         student_id INTEGER,
@@ -98,13 +263,82 @@ def init_db():
         FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id)
     );
 
+    -- latest marks per student/subject, kept current by trg_marks_latest (marks itself keeps history)
+    CREATE TABLE IF NOT EXISTS marks_latest (
+        student_id INTEGER,
+        subject_id INTEGER,
+        marks INTEGER,
+        PRIMARY KEY(student_id, subject_id)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_marks_latest AFTER INSERT ON marks
+    BEGIN
+        INSERT INTO marks_latest (student_id, subject_id, marks)
+        VALUES (NEW.student_id, NEW.subject_id, NEW.marks)
+        ON CONFLICT(student_id, subject_id) DO UPDATE SET marks = excluded.marks;
+    END;
+
     CREATE TABLE IF NOT EXISTS notices (
         notice_id INTEGER PRIMARY KEY AUTOINCREMENT,
         title TEXT,
         content TEXT,
         date TEXT
     );
+
+    -- Indexes for the hot point lookups (users.username is already covered by its UNIQUE constraint)
+    -- one attendance row per student/subject/day; the conflict target for the toggle UPSERT
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_att ON attendance(student_id, subject_id, date);
+    CREATE INDEX IF NOT EXISTS idx_notices_date ON notices(date DESC);
+    CREATE INDEX IF NOT EXISTS idx_users_created ON users(created_at);
+    -- the admin report tabs page through these newest-first (index scanned backwards, rowid breaks ties)
+    CREATE INDEX IF NOT EXISTS idx_att_date ON attendance(date);
+    CREATE INDEX IF NOT EXISTS idx_marks_created ON marks(created_at);
+    -- the student dashboard reads one student's rows newest-first
+    CREATE INDEX IF NOT EXISTS idx_marks_stud_created ON marks(student_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_att_stud_date ON attendance(student_id, date);
+
+    -- Reporting views for the admin Attendance / Marks tabs
+    CREATE VIEW IF NOT EXISTS v_attendance AS
+        SELECT a.attendance_id,
+               COALESCE(s.name, 'Unknown') AS student,
+               COALESCE(sub.subject_name, 'Unknown') AS subject,
+               a.date, a.status,
+               COALESCE(t.name, 'Admin') as marked_by
+        FROM attendance a
+        LEFT JOIN students s ON a.student_id = s.student_id
+        LEFT JOIN subjects sub ON a.subject_id = sub.subject_id
+        LEFT JOIN teachers t ON a.teacher_id = t.teacher_id;
+
+    CREATE VIEW IF NOT EXISTS v_marks AS
+        SELECT m.marks_id,
+               COALESCE(s.name,'Unknown') AS student,
+               COALESCE(sub.subject_name,'Unknown') AS subject,
+               m.marks, m.exam_type,
+               COALESCE(t.name,'Admin') AS recorded_by,
+               m.created_at
+        FROM marks m
+        LEFT JOIN students s ON m.student_id = s.student_id
+        LEFT JOIN subjects sub ON m.subject_id = sub.subject_id
+        LEFT JOIN teachers t ON m.teacher_id = t.teacher_id;
     """)
+    cur.execute(ASSIGNMENTS_DDL)
+    conn.commit()
+
+    if backfill_marks:
+        # first run with marks_latest: replay existing history oldest-first so the newest mark wins
+        cur.executescript("""
+        INSERT INTO marks_latest (student_id, subject_id, marks)
+            SELECT student_id, subject_id, marks FROM marks WHERE true
+            ORDER BY created_at, marks_id
+            ON CONFLICT(student_id, subject_id) DO UPDATE SET marks = excluded.marks;
+        """)
+
+    # planner statistics: gathered once when the student-dashboard indexes are first built, then kept
+    # from going stale as tables grow (statistics collected by hand are kept, never dropped)
+    if new_indexes:
+        cur.execute("ANALYZE")
+    else:
+        reanalyze_drifted(cur)
     conn.commit()
 
     # create default admin user if none exists
@@ -114,7 +348,140 @@ def init_db():
         cur.execute("INSERT INTO users (username,password,role) VALUES (?,?,?)",
                     ("admin", "admin123", "admin"))
         conn.commit()
-    conn.close()
+    return warnings
+
+def reanalyze_drifted(cur):
+    # ANALYZE just the tables whose size moved well away from the row count sqlite_stat1 recorded;
+    # tiny tables are left alone. Returns the tables that were re-analyzed.
+    recorded = {}
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'")
+    if cur.fetchone():
+        for tbl, stat in cur.execute("SELECT tbl, stat FROM sqlite_stat1").fetchall():
+            recorded[tbl] = max(recorded.get(tbl, 0), int(stat.split()[0]))
+    tables = [r[0] for r in cur.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'").fetchall()]
+    stale = []
+    for tbl in tables:
+        rows = cur.execute(f'SELECT count(*) FROM "{tbl}"').fetchone()[0]
+        was = recorded.get(tbl, 0)
+        if max(rows, was) >= 100 and (rows > was * STATS_DRIFT or rows * STATS_DRIFT < was):
+            cur.execute(f'ANALYZE "{tbl}"')
+            stale.append(tbl)
+    return stale
+
+def bulk_insert(sql, rows, chunk=IMPORT_CHUNK):
+    # all chunks go through one transaction: either every row is written or none is
+    conn = get_conn()
+    rows = iter(rows)
+    count = 0
+    with conn:
+        while True:
+            batch = list(islice(rows, chunk))
+            if not batch:
+                break
+            conn.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+def read_import_rows(fh, width, required):
+    # CSV rows cut/padded to width fields; returns (rows, line numbers whose first `required`
+    # fields are blank). Blank lines and a leading "name,..." header are skipped.
+    rows, missing = [], []
+    reader = csv.reader(fh)
+    for i, r in enumerate(reader):
+        if not r or (i == 0 and r[0].strip().lower() == "name"):
+            continue
+        r = [v.strip() for v in r[:width]]
+        r += [""] * (width - len(r))
+        if not all(r[:required]):
+            missing.append(reader.line_num)
+        rows.append(r)
+    return rows, missing
+
+def bulk_add_students(rows):
+    return bulk_insert("INSERT INTO students (name,roll_no,phone,email,course) VALUES (?,?,?,?,?)", rows)
+
+def bulk_add_teachers(rows):
+    return bulk_insert("INSERT INTO teachers (name,phone,email) VALUES (?,?,?)", rows)
+
+# ---------- Shared queries ----------
+# Hot SQL kept as module constants so sqlite3's statement cache (keyed by SQL text) is reused.
+# Teacher roster: today's attendance + latest marks per student, one statement per refresh
+ROSTER_SQL = """
+    SELECT s.student_id, s.roll_no, s.name,
+           COALESCE(a.status, 'NotMarked') AS status,
+           COALESCE(ml.marks, '') AS marks
+    FROM students s
+    LEFT JOIN attendance a
+           ON a.student_id = s.student_id AND a.subject_id = ? AND a.date = ?
+    LEFT JOIN marks_latest ml
+           ON ml.student_id = s.student_id AND ml.subject_id = ?
+    ORDER BY s.roll_no
+"""
+# first click marks Present, later clicks flip the existing row
+ATT_TOGGLE_SQL = """
+    INSERT INTO attendance (student_id,teacher_id,subject_id,date,status) VALUES (?,?,?,?,'Present')
+    ON CONFLICT(student_id,subject_id,date) DO UPDATE
+    SET status = CASE WHEN status='Present' THEN 'Absent' ELSE 'Present' END,
+        teacher_id = excluded.teacher_id
+"""
+RECENT_NOTICES_SQL = "SELECT title,content,date FROM notices ORDER BY date DESC LIMIT 5"
+
+def like_contains(text):
+    # LIKE pattern (used with ESCAPE '\') matching text anywhere; % and _ in text are taken literally
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+# ---------- Background queries ----------
+class BackgroundLoader:
+    """Runs query functions on a worker thread and hands their results back to Tk.
+
+    The worker never touches Tk: finished results are queued and applied from a short
+    after() poll on the main loop, so a burst of refreshes lands in one pass.
+    """
+    POLL_MS = 20
+
+    def __init__(self, widget):
+        self.widget = widget
+        # a single worker keeps results in submission order (a stale refresh never lands last)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._done = queue.Queue()
+        self._pending = 0
+        self._poll_id = None
+
+    @property
+    def busy(self):
+        """True while a submitted fetch has not been applied (or reported as failed) yet."""
+        return self._pending > 0
+
+    def submit(self, fetch, apply):
+        self._pending += 1
+        future = self._executor.submit(fetch)
+        future.add_done_callback(lambda f: self._done.put((apply, f)))
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.POLL_MS, self._drain)
+
+    def _drain(self):
+        self._poll_id = None
+        while True:
+            try:
+                apply, future = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            try:
+                result = future.result()
+            except sqlite3.Error as e:
+                messagebox.showerror("Database error", str(e))
+                continue
+            apply(result)
+        if self._pending:
+            self._poll_id = self.widget.after(self.POLL_MS, self._drain)
+
+    def close(self):
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 # ---------- Application ----------
 class ERPApp(tk.Tk):
@@ -123,7 +490,10 @@ class ERPApp(tk.Tk):
         self.title("ERP - Tkinter + SQLite (Credentials Enabled)")
         self.geometry("1000x650")
         self.resizable(True, True)
-        init_db()
+        # upgrade notes (rows a migration could not carry over) are shown once at startup
+        for warning in init_db():
+            messagebox.showwarning("Database upgrade", warning)
+        READ_POOL.open()
         self.user = None  # will store dict row
         self._frame = None
         self.switch_frame(LoginPage)
@@ -167,7 +537,6 @@ class LoginPage(tk.Frame):
         cur = conn.cursor()
         cur.execute("SELECT * FROM users WHERE username=? AND password=?", (u,p))
         row = cur.fetchone()
-        conn.close()
         if not row:
             messagebox.showerror("Login failed","Invalid username or password")
             return
@@ -184,6 +553,22 @@ class LoginPage(tk.Frame):
 
 # ---------- Admin Dashboard ----------
 class AdminDashboard(tk.Frame):
+    # tabs showing each table (directly or through a join)
+    TABLE_TABS = {
+        "students": ("Students", "Attendance", "Marks"),
+        "teachers": ("Teachers", "Assignments", "Attendance", "Marks"),
+        "subjects": ("Subjects", "Assignments", "Attendance", "Marks"),
+        "assignments": ("Assignments",),
+        "users": ("Credentials",),
+        "notices": ("Notices",),
+    }
+    # combobox labels for the Assign / Create Login dialogs, cached until invalidate() touches the table
+    CHOICE_SQL = {
+        "teachers": "SELECT teacher_id || ' - ' || name FROM teachers",
+        "subjects": "SELECT subject_id || ' - ' || subject_name FROM subjects",
+        "students": "SELECT student_id || ' - ' || name || ' (' || roll_no || ')' FROM students",
+    }
+
     def __init__(self, master):
         super().__init__(master)
         ttk.Label(self, text="Admin Dashboard", font=("TkDefaultFont", 18)).pack(pady=8)
@@ -196,150 +581,183 @@ class AdminDashboard(tk.Frame):
         ttk.Button(top, text="Assign Teacher -> Subject", command=self.assign_teacher).grid(row=0, column=3, padx=6, pady=6)
         ttk.Button(top, text="Create Login", command=self.create_login).grid(row=0, column=4, padx=6, pady=6)
         ttk.Button(top, text="Add Notice", command=self.add_notice).grid(row=0, column=5, padx=6, pady=6)
-        ttk.Button(top, text="Logout", command=self.logout).grid(row=0, column=6, padx=6, pady=6)
+        ttk.Button(top, text="Import CSV", command=self.import_csv).grid(row=0, column=6, padx=6, pady=6)
+        ttk.Button(top, text="Logout", command=self.logout).grid(row=0, column=7, padx=6, pady=6)
 
         # Notebook for tabs (Students, Teachers, Subjects, Assignments, Notices, Credentials, Attendance, Marks)
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
 
         self.tabs = {}
+        self._tab_names = {}  # widget path -> tab name, so tab changes need no notebook.tab() lookup
         for name in ("Students","Teachers","Subjects","Assignments","Notices","Credentials","Attendance","Marks"):
             frame = ttk.Frame(self.notebook)
             self.notebook.add(frame, text=name)
             self.tabs[name] = frame
-
-        self.refresh_all()
-
-    def refresh_all(self):
-        self.load_students(); self.load_teachers(); self.load_subjects()
-        self.load_assignments(); self.load_notices(); self.load_credentials()
-        self.load_attendance(); self.load_marks()
+            self._tab_names[str(frame)] = name
+
+        self.loader = BackgroundLoader(self)
+        self._pending_refresh = None
+        self._choice_cache = {}
+        self.build_tabs()
+        self.loaders = {"Students": self.load_students, "Teachers": self.load_teachers,
+                        "Subjects": self.load_subjects, "Assignments": self.load_assignments,
+                        "Notices": self.load_notices, "Credentials": self.load_credentials,
+                        "Attendance": self.load_attendance, "Marks": self.load_marks}
+        # every tab starts dirty; each is loaded the first time it is shown
+        self._dirty = set(self.tabs)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.refresh_dirty())
+        self.refresh_dirty()
+
+    def invalidate(self, *tables):
+        for t in tables:
+            self._dirty.update(self.TABLE_TABS[t])
+            self._choice_cache.pop(t, None)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        # a burst of changes collapses into one refresh of the visible tab
+        if self._pending_refresh is not None:
+            self.after_cancel(self._pending_refresh)
+        self._pending_refresh = self.after(REFRESH_DEBOUNCE_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._pending_refresh = None
+        self.refresh_dirty()
+
+    def refresh_dirty(self):
+        # only the visible tab is reloaded; other dirty tabs wait until they are selected
+        name = self._tab_names[str(self.notebook.select())]
+        if name in self._dirty:
+            self._dirty.discard(name)
+            self.loaders[name]()
+
+    def destroy(self):
+        if self._pending_refresh is not None:
+            self.after_cancel(self._pending_refresh)
+        self.loader.close()
+        super().destroy()
 
     def logout(self):
         self.master.user = None
         self.master.switch_frame(LoginPage)
 
-    # ---------- Loading functions ----------
-    def load_students(self):
-        f = self.tabs["Students"]
-        for w in f.winfo_children(): w.destroy()
-        cols = ("student_id","name","roll_no","phone","email","course")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
+    # ---------- Tab widgets (built once, refreshed in place) ----------
+    def build_tabs(self):
+        self.trees = {}
+        for name, cols in (("Students", ("student_id","name","roll_no","phone","email","course")),
+                           ("Teachers", ("teacher_id","name","phone","email")),
+                           ("Subjects", ("subject_id","subject_name","subject_code")),
+                           ("Credentials", ("user_id","username","role","reference_id","created_at")),
+                           ("Attendance", ("attendance_id","student","subject","date","status","marked_by")),
+                           ("Marks", ("marks_id","student","subject","marks","exam_type","recorded_by","created_at"))):
+            self.trees[name] = self._scrolled_tree(self.tabs[name], cols)
+        # assignments are keyed by the (teacher_id, subject_id) pair
+        self.trees["Assignments"] = self._scrolled_tree(self.tabs["Assignments"], ("teacher_id","subject_id","teacher","subject"), key_cols=2)
+
+        # notices: list on top, recent notice text below
+        self.trees["Notices"] = self._scrolled_tree(self.tabs["Notices"], ("notice_id","title","date"), height=8, side="top")
+        self.notice_text = tk.Text(self.tabs["Notices"], height=6, state="disabled", undo=False)
+        self.notice_text.pack(side="bottom", fill="x", padx=6, pady=6)
+
+        # paging for the report tabs and the credentials list
+        self._offset = {}
+        self._page_size = {}
+        self._page_labels = {}
+        self._paging = set()  # paged tabs with a load in flight; their row_count is not current yet
+        for name in ("Attendance", "Marks"):
+            self._add_pager(name, PAGE_SIZE)
+        pager = self._add_pager("Credentials", CRED_PAGE_SIZE)
+        # username search is pushed into the SQL (LIKE), so only matching rows are fetched
+        self.cred_filter = ""
+        ttk.Label(pager, text="Search username").pack(side="left", padx=(20, 4))
+        self.cred_search = ttk.Entry(pager)
+        self.cred_search.pack(side="left")
+        self.cred_search.bind("<Return>", lambda e: self.search_credentials())
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT student_id,name,roll_no,phone,email,course FROM students ORDER BY roll_no")
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["student_id"], r["name"], r["roll_no"], r["phone"], r["email"], r["course"]))
-        conn.close()
+        # controls to reveal/reset password
+        tree = self.trees["Credentials"]
+        ctrl = ttk.Frame(self.tabs["Credentials"])
+        ctrl.pack(side="bottom", fill="x", padx=6, pady=6, before=tree)
+        ttk.Button(ctrl, text="Show Password", command=lambda: self.show_password(tree)).pack(side="left", padx=6)
+        ttk.Button(ctrl, text="Reset Password", command=lambda: self.reset_password(tree)).pack(side="left", padx=6)
+        ttk.Button(ctrl, text="Refresh", command=self.load_credentials).pack(side="left", padx=6)
+        ttk.Label(ctrl, text="(Admin can view or reset passwords here)").pack(side="left", padx=10)
 
-    def load_teachers(self):
-        f = self.tabs["Teachers"]; 
-        for w in f.winfo_children(): w.destroy()
-        cols = ("teacher_id","name","phone","email")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
+    def _add_pager(self, name, page_size):
+        ctrl = ttk.Frame(self.tabs[name])
+        ctrl.pack(side="bottom", fill="x", padx=6, pady=6, before=self.trees[name])
+        ttk.Button(ctrl, text="< Prev", command=lambda: self._page(name, -1)).pack(side="left", padx=6)
+        ttk.Button(ctrl, text="Next >", command=lambda: self._page(name, 1)).pack(side="left", padx=6)
+        self._page_labels[name] = ttk.Label(ctrl)
+        self._page_labels[name].pack(side="left", padx=10)
+        self._offset[name] = 0
+        self._page_size[name] = page_size
+        return ctrl
+
+    def _scrolled_tree(self, f, cols, height=12, side="left", key_cols=1):
+        tree = DataTree(f, cols, key_cols=key_cols, height=height)
+        tree.pack(side=side, fill="both", expand=True)
         sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
         tree.configure(yscrollcommand=sb.set)
+        return tree
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT teacher_id,name,phone,email FROM teachers")
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["teacher_id"], r["name"], r["phone"], r["email"]))
-        conn.close()
+    # ---------- Loading functions ----------
+    # queries run on the background loader; rows are applied to the tab's tree on the Tk thread
+    def _load(self, name, sql, params=(), apply=None):
+        self.loader.submit(lambda: fetch_rows(sql, params), apply or self.trees[name].sync)
 
-    def load_subjects(self):
-        f = self.tabs["Subjects"]; 
-        for w in f.winfo_children(): w.destroy()
-        cols = ("subject_id","subject_name","subject_code")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
+    def _load_page(self, name, sql, params):
+        self._paging.add(name)
+        self._load(name, sql, params, lambda rows: self._show_page(name, rows))
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT subject_id,subject_name,subject_code FROM subjects")
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["subject_id"], r["subject_name"], r["subject_code"]))
-        conn.close()
+    def load_students(self):
+        self._load("Students", "SELECT student_id,name,roll_no,phone,email,course FROM students ORDER BY roll_no")
 
-    def load_assignments(self):
-        f = self.tabs["Assignments"]; 
-        for w in f.winfo_children(): w.destroy()
-        cols = ("id","teacher","subject")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
+    def load_teachers(self):
+        self._load("Teachers", "SELECT teacher_id,name,phone,email FROM teachers")
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("""
-            SELECT a.id, t.name as teacher, s.subject_name as subject
+    def load_subjects(self):
+        self._load("Subjects", "SELECT subject_id,subject_name,subject_code FROM subjects")
+
+    def load_assignments(self):
+        self._load("Assignments", """
+            SELECT a.teacher_id, a.subject_id, t.name as teacher, s.subject_name as subject
             FROM assignments a
             LEFT JOIN teachers t ON a.teacher_id = t.teacher_id
             LEFT JOIN subjects s ON a.subject_id = s.subject_id
         """)
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["id"], r["teacher"], r["subject"]))
-        conn.close()
 
     def load_notices(self):
-        f = self.tabs["Notices"]; 
-        for w in f.winfo_children(): w.destroy()
-        cols = ("notice_id","title","date")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=8)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="top", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
+        def fetch():
+            with READ_POOL.acquire() as conn, read_txn(conn):
+                return (conn.execute("SELECT notice_id,title,date FROM notices ORDER BY date DESC").fetchall(),
+                        conn.execute(RECENT_NOTICES_SQL).fetchall())
+        self.loader.submit(fetch, self._show_notices)
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT notice_id,title,date FROM notices ORDER BY date DESC")
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["notice_id"], r["title"], r["date"]))
-        conn.close()
+    def _show_notices(self, result):
+        rows, recent = result
+        self.trees["Notices"].sync(rows)
 
         # show recent notice text below
-        text = tk.Text(f, height=6, state="disabled")
-        text.pack(side="bottom", fill="x", padx=6, pady=6)
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT title,content,date FROM notices ORDER BY date DESC LIMIT 5")
+        text = self.notice_text
         text.config(state="normal")
         text.delete("1.0","end")
-        for n in cur.fetchall():
-            text.insert("end", f"{n['date']} - {n['title']}\n{n['content']}\n\n")
+        text.insert("end", "".join(f"{n['date']} - {n['title']}\n{n['content']}\n\n" for n in recent))
         text.config(state="disabled")
-        conn.close()
 
     def load_credentials(self):
-        f = self.tabs["Credentials"]
-        for w in f.winfo_children(): w.destroy()
-        cols = ("user_id","username","role","reference_id","created_at")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
-
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT user_id,username,role,reference_id,created_at FROM users ORDER BY created_at DESC")
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["user_id"], r["username"], r["role"], r["reference_id"], r["created_at"]))
-        conn.close()
-
-        # controls to reveal/reset password
-        ctrl = ttk.Frame(f)
-        ctrl.pack(side="bottom", fill="x", padx=6, pady=6)
-        ttk.Button(ctrl, text="Show Password", command=lambda: self.show_password(tree)).pack(side="left", padx=6)
-        ttk.Button(ctrl, text="Reset Password", command=lambda: self.reset_password(tree)).pack(side="left", padx=6)
-        ttk.Button(ctrl, text="Refresh", command=self.load_credentials).pack(side="left", padx=6)
-        ttk.Label(ctrl, text="(Admin can view or reset passwords here)").pack(side="left", padx=10)
+        pattern = like_contains(self.cred_filter)
+        self._load_page("Credentials", r"""
+            SELECT user_id,username,role,reference_id,created_at FROM users
+            WHERE username LIKE ? ESCAPE '\'
+            ORDER BY created_at DESC, user_id DESC LIMIT ? OFFSET ?
+        """, (pattern, CRED_PAGE_SIZE, self._offset["Credentials"]))
+
+    def search_credentials(self):
+        self.cred_filter = self.cred_search.get().strip()
+        self._offset["Credentials"] = 0
+        self.load_credentials()
 
     def show_password(self, tree):
         sel = tree.selection()
@@ -350,7 +768,7 @@ class AdminDashboard(tk.Frame):
         user_id = item["values"][0]
         conn = get_conn(); cur = conn.cursor()
         cur.execute("SELECT username,password,role FROM users WHERE user_id=?", (user_id,))
-        r = cur.fetchone(); conn.close()
+        r = cur.fetchone()
         if not r:
             messagebox.showerror("Error","User not found")
             return
@@ -369,64 +787,40 @@ class AdminDashboard(tk.Frame):
             return
         conn = get_conn(); cur = conn.cursor()
         cur.execute("UPDATE users SET password=?, created_at=? WHERE user_id=?", (new_pw, datetime.now().isoformat(), user_id))
-        conn.commit(); conn.close()
+        conn.commit()
         messagebox.showinfo("Success", "Password reset")
-        self.load_credentials()
+        self.invalidate("users")
 
     def load_attendance(self):
-        f = self.tabs["Attendance"]
-        for w in f.winfo_children(): w.destroy()
-        cols = ("attendance_id","student","subject","date","status","marked_by")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
-
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("""
-            SELECT a.attendance_id,
-                   COALESCE(s.name, 'Unknown') AS student,
-                   COALESCE(sub.subject_name, 'Unknown') AS subject,
-                   a.date, a.status,
-                   COALESCE(t.name, 'Admin') as marked_by
-            FROM attendance a
-            LEFT JOIN students s ON a.student_id = s.student_id
-            LEFT JOIN subjects sub ON a.subject_id = sub.subject_id
-            LEFT JOIN teachers t ON a.teacher_id = t.teacher_id
-            ORDER BY a.date DESC
-        """)
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["attendance_id"], r["student"], r["subject"], r["date"], r["status"], r["marked_by"]))
-        conn.close()
+        self._load_page("Attendance", """
+            SELECT attendance_id, student, subject, date, status, marked_by FROM v_attendance
+            ORDER BY date DESC, attendance_id DESC LIMIT ? OFFSET ?
+        """, (PAGE_SIZE, self._offset["Attendance"]))
 
     def load_marks(self):
-        f = self.tabs["Marks"]
-        for w in f.winfo_children(): w.destroy()
-        cols = ("marks_id","student","subject","marks","exam_type","recorded_by","created_at")
-        tree = ttk.Treeview(f, columns=cols, show="headings", height=12)
-        for c in cols: tree.heading(c, text=c.title())
-        tree.pack(side="left", fill="both", expand=True)
-        sb = ttk.Scrollbar(f, command=tree.yview); sb.pack(side="right", fill="y")
-        tree.configure(yscrollcommand=sb.set)
+        self._load_page("Marks", """
+            SELECT marks_id, student, subject, marks, exam_type, recorded_by, created_at FROM v_marks
+            ORDER BY created_at DESC, marks_id DESC LIMIT ? OFFSET ?
+        """, (PAGE_SIZE, self._offset["Marks"]))
+
+    def _page(self, name, step):
+        # clicks are ignored until the previous load of this tab has landed, so the bound check
+        # below never runs against a stale row_count; a failed load leaves the loader idle
+        if name in self._paging and self.loader.busy:
+            return
+        size = self._page_size[name]
+        offset = self._offset[name] + step * size
+        # no page before the first, and no next page once the current one came back short
+        if offset < 0 or (step > 0 and self.trees[name].row_count < size):
+            return
+        self._offset[name] = offset
+        self.loaders[name]()
 
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("""
-            SELECT m.marks_id,
-                   COALESCE(s.name,'Unknown') AS student,
-                   COALESCE(sub.subject_name,'Unknown') AS subject,
-                   m.marks, m.exam_type,
-                   COALESCE(t.name,'Admin') AS recorded_by,
-                   m.created_at
-            FROM marks m
-            LEFT JOIN students s ON m.student_id = s.student_id
-            LEFT JOIN subjects sub ON m.subject_id = sub.subject_id
-            LEFT JOIN teachers t ON m.teacher_id = t.teacher_id
-            ORDER BY m.created_at DESC
-        """)
-        for r in cur.fetchall():
-            tree.insert("", "end", values=(r["marks_id"], r["student"], r["subject"], r["marks"], r["exam_type"], r["recorded_by"], r["created_at"]))
-        conn.close()
+    def _show_page(self, name, rows):
+        self._paging.discard(name)
+        self.trees[name].sync(rows)
+        offset = self._offset[name]
+        self._page_labels[name].config(text=f"Rows {offset + 1}-{offset + len(rows)}" if rows else "No rows")
 
     # ---------- Admin actions ----------
     def add_student(self):
@@ -440,9 +834,9 @@ class AdminDashboard(tk.Frame):
                 conn.commit()
                 messagebox.showinfo("Success","Student added")
             except sqlite3.IntegrityError:
+                conn.rollback()
                 messagebox.showerror("Error","Roll No must be unique")
-            conn.close()
-            self.refresh_all()
+            self.invalidate("students")
 
     def add_teacher(self):
         dlg = SimpleForm(self, "Add Teacher", ("Name","Phone","Email"))
@@ -451,9 +845,9 @@ class AdminDashboard(tk.Frame):
             name, phone, email = dlg.result
             conn = get_conn(); cur = conn.cursor()
             cur.execute("INSERT INTO teachers (name,phone,email) VALUES (?,?,?)", (name,phone,email))
-            conn.commit(); conn.close()
+            conn.commit()
             messagebox.showinfo("Success","Teacher added")
-            self.refresh_all()
+            self.invalidate("teachers")
 
     def add_subject(self):
         dlg = SimpleForm(self, "Add Subject", ("Subject Name","Subject Code"))
@@ -466,15 +860,18 @@ class AdminDashboard(tk.Frame):
                 conn.commit()
                 messagebox.showinfo("Success","Subject added")
             except sqlite3.IntegrityError:
+                conn.rollback()
                 messagebox.showerror("Error","Subject code must be unique")
-            conn.close()
-            self.refresh_all()
+            self.invalidate("subjects")
+
+    def _choices(self, table):
+        labels = self._choice_cache.get(table)
+        if labels is None:
+            labels = self._choice_cache[table] = tuple(r[0] for r in get_conn().execute(self.CHOICE_SQL[table]))
+        return labels
 
     def assign_teacher(self):
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT teacher_id,name FROM teachers"); teachers = cur.fetchall()
-        cur.execute("SELECT subject_id,subject_name FROM subjects"); subjects = cur.fetchall()
-        conn.close()
+        teachers, subjects = self._choices("teachers"), self._choices("subjects")
         if not teachers or not subjects:
             messagebox.showerror("Error","Add teachers and subjects first")
             return
@@ -483,22 +880,21 @@ class AdminDashboard(tk.Frame):
         if dlg.result:
             t_id, s_id = dlg.result
             conn = get_conn(); cur = conn.cursor()
-            cur.execute("INSERT INTO assignments (teacher_id,subject_id) VALUES (?,?)", (t_id, s_id))
-            conn.commit(); conn.close()
-            messagebox.showinfo("Success","Assigned")
-            self.refresh_all()
+            try:
+                cur.execute("INSERT INTO assignments (teacher_id,subject_id) VALUES (?,?)", (t_id, s_id))
+                conn.commit()
+                messagebox.showinfo("Success","Assigned")
+                self.invalidate("assignments")
+            except sqlite3.IntegrityError:
+                conn.rollback()
+                messagebox.showerror("Error","Teacher is already assigned to that subject")
 
     def create_login(self):
         role = simpledialog.askstring("Role","Enter role to create login (teacher/student)")
         if not role or role.lower() not in ("teacher","student"):
             messagebox.showerror("Error","Role must be 'teacher' or 'student'")
             return
-        conn = get_conn(); cur = conn.cursor()
-        if role.lower() == "teacher":
-            cur.execute("SELECT teacher_id,name FROM teachers"); rows = cur.fetchall()
-        else:
-            cur.execute("SELECT student_id,name,roll_no FROM students"); rows = cur.fetchall()
-        conn.close()
+        rows = self._choices(role.lower() + "s")
         if not rows:
             messagebox.showerror("Error","No records found for that role")
             return
@@ -513,9 +909,9 @@ class AdminDashboard(tk.Frame):
                 conn.commit()
                 messagebox.showinfo("Success","Login created")
             except sqlite3.IntegrityError:
+                conn.rollback()
                 messagebox.showerror("Error","Username already exists")
-            conn.close()
-            self.refresh_all()
+            self.invalidate("users")
 
     def add_notice(self):
         dlg = SimpleForm(self, "Add Notice", ("Title","Content"))
@@ -524,9 +920,40 @@ class AdminDashboard(tk.Frame):
             title, content = dlg.result
             conn = get_conn(); cur = conn.cursor()
             cur.execute("INSERT INTO notices (title,content,date) VALUES (?,?,?)", (title,content,str(date.today())))
-            conn.commit(); conn.close()
+            conn.commit()
             messagebox.showinfo("Success","Notice added")
-            self.refresh_all()
+            self.invalidate("notices")
+
+    def import_csv(self):
+        kind = simpledialog.askstring("Import CSV","Import which records? (students/teachers)")
+        if not kind or kind.lower() not in ("students","teachers"):
+            messagebox.showerror("Error","Enter 'students' or 'teachers'")
+            return
+        kind = kind.lower()
+        # column order matches the Add Student / Add Teacher forms; a leading "name,..." header is skipped
+        width, bulk_add = (5, bulk_add_students) if kind == "students" else (3, bulk_add_teachers)
+        # the same fields the add forms insist on: name, plus roll_no for students
+        required = 2 if kind == "students" else 1
+        path = filedialog.askopenfilename(title="Import " + kind, filetypes=[("CSV files","*.csv"),("All files","*.*")])
+        if not path:
+            return
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as fh:
+                rows, missing = read_import_rows(fh, width, required)
+            if missing:
+                field = "Name and Roll No" if required == 2 else "Name"
+                lines = ", ".join(map(str, missing[:10])) + (" ..." if len(missing) > 10 else "")
+                messagebox.showerror("Error", f"{field} required - missing on line(s) {lines}. Nothing was imported")
+                return
+            count = bulk_add(rows)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            messagebox.showerror("Error", f"Could not read file: {e}")
+            return
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error","Import failed (duplicate Roll No?) - nothing was imported")
+            return
+        messagebox.showinfo("Success", f"{count} {kind} imported")
+        self.invalidate(kind)
 
 # ---------- Teacher Dashboard ----------
 class TeacherDashboard(tk.Frame):
@@ -540,7 +967,6 @@ class TeacherDashboard(tk.Frame):
         conn = get_conn(); cur = conn.cursor()
         cur.execute("SELECT name FROM teachers WHERE teacher_id=?", (teacher_ref,))
         trow = cur.fetchone()
-        conn.close()
         tname = trow["name"] if trow else "Teacher"
 
         ttk.Label(self, text=f"Welcome, {tname}").pack(pady=6)
@@ -554,18 +980,17 @@ class TeacherDashboard(tk.Frame):
             WHERE a.teacher_id = ?
         """, (teacher_ref,))
         self.subjects = cur.fetchall()
-        conn.close()
 
         frame = ttk.Frame(self)
         frame.pack(pady=10)
         ttk.Label(frame, text="Select Subject").grid(row=0, column=0, padx=6)
-        self.sub_cb = ttk.Combobox(frame, values=[f"{r['subject_id']} - {r['subject_name']}" for r in self.subjects])
+        # combobox label -> subject_id, built once per session instead of parsing the label per click
+        self.subject_map = {f"{r['subject_id']} - {r['subject_name']}": r["subject_id"] for r in self.subjects}
+        self.sub_cb = ttk.Combobox(frame, values=list(self.subject_map))
         self.sub_cb.grid(row=0, column=1, padx=6)
         ttk.Button(frame, text="Load Students", command=self.load_students).grid(row=0, column=2, padx=6)
 
-        self.tree = ttk.Treeview(self, columns=("id","roll","name","att","marks"), show="headings", height=18)
-        for c in ("id","roll","name","att","marks"):
-            self.tree.heading(c, text=c.title())
+        self.tree = DataTree(self, ("id","roll","name","att","marks"), height=18)
         self.tree.pack(fill="both", expand=True, padx=10, pady=10)
 
         btns = ttk.Frame(self)
@@ -573,9 +998,20 @@ class TeacherDashboard(tk.Frame):
         ttk.Button(btns, text="Mark Attendance (toggle)", command=self.mark_attendance).grid(row=0, column=0, padx=6)
         ttk.Button(btns, text="Update Marks", command=self.update_marks).grid(row=0, column=1, padx=6)
         ttk.Button(btns, text="Refresh", command=self.load_students).grid(row=0, column=2, padx=6)
+        ttk.Button(btns, text="Mark All Present", command=lambda: self.mark_all("Present")).grid(row=0, column=3, padx=6)
+        ttk.Button(btns, text="Mark All Absent", command=lambda: self.mark_all("Absent")).grid(row=0, column=4, padx=6)
 
+        self.loader = BackgroundLoader(self)
+        self._pending_refresh = None
+        self._today = str(date.today())
         self.load_students_initial()
 
+    def destroy(self):
+        if self._pending_refresh is not None:
+            self.after_cancel(self._pending_refresh)
+        self.loader.close()
+        super().destroy()
+
     def logout(self):
         self.master.user = None
         self.master.switch_frame(LoginPage)
@@ -588,66 +1024,71 @@ class TeacherDashboard(tk.Frame):
             self.load_students()
 
     def load_students(self):
-        sel = self.sub_cb.get().strip()
-        if not sel:
+        subject_id = self.subject_map.get(self.sub_cb.get())
+        if subject_id is None:
             messagebox.showerror("Error","Select a subject")
             return
-        subject_id = int(sel.split(" - ")[0])
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT student_id, name, roll_no FROM students ORDER BY roll_no")
-        students = cur.fetchall()
-        self.tree.delete(*self.tree.get_children())
-        for s in students:
-            today = str(date.today())
-            cur.execute("SELECT status FROM attendance WHERE student_id=? AND subject_id=? AND date=?", (s["student_id"], subject_id, today))
-            att_r = cur.fetchone()
-            status = att_r["status"] if att_r else "NotMarked"
-            cur.execute("SELECT marks FROM marks WHERE student_id=? AND subject_id=?", (s["student_id"], subject_id))
-            m = cur.fetchone()
-            marks = m["marks"] if m else ""
-            self.tree.insert("", "end", values=(s["student_id"], s["roll_no"], s["name"], status, marks))
-        conn.close()
+        # formatted once per refresh; toggles reuse it so they write the day the roster shows
+        self._today = today = str(date.today())
+        self.loader.submit(lambda: fetch_rows(ROSTER_SQL, (subject_id, today, subject_id)), self.tree.sync)
+
+    def _schedule_refresh(self):
+        # rapid toggles share one roster reload
+        if self._pending_refresh is not None:
+            self.after_cancel(self._pending_refresh)
+        self._pending_refresh = self.after(REFRESH_DEBOUNCE_MS, self._do_refresh)
+
+    def _do_refresh(self):
+        self._pending_refresh = None
+        self.load_students()
 
     def mark_attendance(self):
-        sel = self.sub_cb.get().strip()
-        if not sel:
+        subject_id = self.subject_map.get(self.sub_cb.get())
+        if subject_id is None:
             messagebox.showerror("Error","Select a subject")
             return
-        subject_id = int(sel.split(" - ")[0])
         selected = self.tree.selection()
         if not selected:
             messagebox.showerror("Error","Select a student row to toggle attendance")
             return
-        item = self.tree.item(selected[0])
-        student_id = item["values"][0]
-        today = str(date.today())
+        student_id = int(selected[0])  # roster iids are student ids
+        today = self._today
         teacher_ref = self.master.user.get("reference_id")
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT attendance_id,status FROM attendance WHERE student_id=? AND subject_id=? AND date=?", (student_id, subject_id, today))
-        r = cur.fetchone()
-        if r:
-            new_status = "Present" if r["status"]=="Absent" else "Absent"
-            cur.execute("UPDATE attendance SET status=?, teacher_id=? WHERE attendance_id=?", (new_status, teacher_ref, r["attendance_id"]))
-        else:
-            new_status = "Present"
-            cur.execute("INSERT INTO attendance (student_id,teacher_id,subject_id,date,status) VALUES (?,?,?,?,?)",
-                        (student_id, teacher_ref, subject_id, today, new_status))
-        conn.commit(); conn.close()
-        self.load_students()
+        conn = get_conn()
+        conn.execute(ATT_TOGGLE_SQL, (student_id, teacher_ref, subject_id, today))
+        conn.commit()
+        self._schedule_refresh()
+
+    def mark_all(self, status):
+        subject_id = self.subject_map.get(self.sub_cb.get())
+        if subject_id is None:
+            messagebox.showerror("Error","Select a subject")
+            return
+        today = self._today
+        teacher_ref = self.master.user.get("reference_id")
+        conn = get_conn()
+        # one UPSERT for the whole roster instead of one transaction per student
+        # ("WHERE true" keeps SQLite from reading ON CONFLICT as part of the SELECT)
+        with conn:
+            conn.execute("""
+                INSERT INTO attendance (student_id,teacher_id,subject_id,date,status)
+                SELECT student_id, ?, ?, ?, ? FROM students WHERE true
+                ON CONFLICT(student_id,subject_id,date) DO UPDATE
+                SET status = excluded.status, teacher_id = excluded.teacher_id
+            """, (teacher_ref, subject_id, today, status))
+        self._schedule_refresh()
 
     def update_marks(self):
-        sel = self.sub_cb.get().strip()
-        if not sel:
+        subject_id = self.subject_map.get(self.sub_cb.get())
+        if subject_id is None:
             messagebox.showerror("Error","Select a subject")
             return
-        subject_id = int(sel.split(" - ")[0])
         selected = self.tree.selection()
         if not selected:
             messagebox.showerror("Error","Select a student row to update marks")
             return
-        item = self.tree.item(selected[0])
-        student_id = item["values"][0]
-        current_marks = item["values"][4] or ""
+        student_id = int(selected[0])  # roster iids are student ids
+        current_marks = self.tree.set(selected[0], "marks")
         val = simpledialog.askinteger("Marks", f"Enter marks for student (current: {current_marks})", minvalue=0, maxvalue=100)
         if val is None:
             return
@@ -657,31 +1098,67 @@ class TeacherDashboard(tk.Frame):
         # insert a new marks record (keeps history)
         cur.execute("INSERT INTO marks (student_id,subject_id,teacher_id,marks,exam_type) VALUES (?,?,?,?,?)",
                     (student_id, subject_id, teacher_ref, val, exam_type))
-        conn.commit(); conn.close()
-        self.load_students()
+        conn.commit()
+        self._schedule_refresh()
 
 # ---------- Student Dashboard ----------
 class StudentDashboard(tk.Frame):
+    # the three parts of the dashboard; f1..f4 line up so they can share one compound SELECT.
+    # Limited parts are wrapped in subqueries (a compound arm can't carry ORDER BY/LIMIT itself).
+    _SQL_NOTICES = """
+        SELECT * FROM (SELECT 'N' AS kind, title AS f1, content AS f2, date AS f3, date AS f4
+                       FROM notices ORDER BY date DESC LIMIT 5)"""
+    # subject names are resolved from self._subjects, so these read marks/attendance alone; the
+    # IN (subjects) semi-join keeps rows of vanished subjects out, as a join on subjects would
+    _SQL_MARKS = """
+        SELECT 'M', subject_id, marks, exam_type, created_at
+        FROM marks
+        WHERE student_id = ?1 AND subject_id IN (SELECT subject_id FROM subjects)"""
+    _SQL_ATTEND = """
+        SELECT * FROM (SELECT 'A', date, subject_id, status, date
+                       FROM attendance
+                       WHERE student_id = ?1 AND subject_id IN (SELECT subject_id FROM subjects)
+                       ORDER BY date DESC LIMIT 20)"""
+    # "kind" says which widget a row feeds; f4 is each part's sort key, since ordering
+    # inside a compound SELECT is only guaranteed by the outer ORDER BY.
+    # Built once at class creation, so every refresh hands the statement cache the same string.
+    INFO_SQL = "\n        UNION ALL".join((_SQL_NOTICES, _SQL_MARKS, _SQL_ATTEND)) + "\n        ORDER BY kind, f4 DESC"
+    # cheap probe that changes whenever INFO_SQL's result would: notices and marks are insert-only,
+    # attendance toggles rewrite status in place, so the shown rows' ids and statuses are compared
+    VERSION_SQL = """
+        SELECT (SELECT MAX(notice_id) FROM notices),
+               (SELECT MAX(marks_id) FROM marks WHERE student_id = ?1),
+               (SELECT group_concat(attendance_id || status) FROM
+                   (SELECT attendance_id, status FROM attendance
+                    WHERE student_id = ?1 AND subject_id IN (SELECT subject_id FROM subjects)
+                    ORDER BY date DESC LIMIT 20))
+    """
+
     def __init__(self, master):
         super().__init__(master)
         ttk.Label(self, text="Student Dashboard", font=("TkDefaultFont", 18)).pack(pady=8)
         ttk.Button(self, text="Logout", command=self.logout).pack(anchor="ne", padx=10)
+        self.loader = BackgroundLoader(self)
+        self._poll_id = None
+        self._versions = None
 
         ref = master.user.get("reference_id")
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT * FROM students WHERE student_id=?", (ref,))
-        self.student = cur.fetchone()
-        conn.close()
+        with READ_POOL.acquire() as conn:
+            self.student = conn.execute("SELECT * FROM students WHERE student_id=?", (ref,)).fetchone()
+            # subject_id -> name; only the Tk thread replaces it (see _show_info), workers just read it
+            self._subjects = dict(conn.execute("SELECT subject_id, subject_name FROM subjects").fetchall())
         if not self.student:
             messagebox.showerror("Error","Student record not found")
             master.switch_frame(LoginPage)
             return
+        self._sid = int(self.student["student_id"])
+        self._do_refresh = self._make_refresher()
 
         ttk.Label(self, text=f"Welcome, {self.student['name']} (Roll: {self.student['roll_no']})").pack(pady=6)
         ttk.Button(self, text="Refresh Info", command=self.load_info).pack(pady=6)
 
         ttk.Label(self, text="Notices").pack()
-        self.notice_box = tk.Text(self, height=6, width=100, state="disabled")
+        self.notice_box = tk.Text(self, height=6, width=100, state="disabled", undo=False)
         self.notice_box.pack(pady=6)
 
         ttk.Label(self, text="Marks").pack()
@@ -697,43 +1174,136 @@ class StudentDashboard(tk.Frame):
         self.atree.pack(pady=6)
 
         self.load_info()
+        self._poll_id = self.after(STUDENT_POLL_MS, self._poll)
+
+    def destroy(self):
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        self.loader.close()
+        super().destroy()
 
     def logout(self):
         self.master.user = None
         self.master.switch_frame(LoginPage)
 
     def load_info(self):
-        conn = get_conn(); cur = conn.cursor()
-        cur.execute("SELECT title,content,date FROM notices ORDER BY date DESC LIMIT 5")
-        notices = cur.fetchall()
-        self.notice_box.config(state="normal")
-        self.notice_box.delete("1.0","end")
-        for n in notices:
-            self.notice_box.insert("end", f"{n['date']} - {n['title']}\n{n['content']}\n\n")
-        self.notice_box.config(state="disabled")
-
-        self.mtree.delete(*self.mtree.get_children())
-        cur.execute("""
-            SELECT sub.subject_name as subject, m.marks, m.exam_type, m.created_at
-            FROM marks m
-            JOIN subjects sub ON m.subject_id = sub.subject_id
-            WHERE m.student_id = ?
-            ORDER BY m.created_at DESC
-        """, (self.student["student_id"],))
-        for r in cur.fetchall():
-            self.mtree.insert("", "end", values=(r["subject"], r["marks"], r["exam_type"], r["created_at"]))
-
-        self.atree.delete(*self.atree.get_children())
-        cur.execute("""
-            SELECT a.date, sub.subject_name as subject, a.status
-            FROM attendance a
-            JOIN subjects sub ON a.subject_id = sub.subject_id
-            WHERE a.student_id = ?
-            ORDER BY a.date DESC LIMIT 20
-        """, (self.student["student_id"],))
-        for r in cur.fetchall():
-            self.atree.insert("", "end", values=(r["date"], r["subject"], r["status"]))
-        conn.close()
+        self._do_refresh()
+
+    def _poll(self):
+        # refetch only when the version probe moved since the last load
+        self._poll_id = self.after(STUDENT_POLL_MS, self._poll)
+        params = (self._sid,)
+        self.loader.submit(lambda: fetch_rows(self.VERSION_SQL, params)[0], self._check_versions)
+
+    def _check_versions(self, versions):
+        if versions != self._versions:
+            self._do_refresh()
+
+    def _make_refresher(self):
+        # everything a refresh needs is fixed for the session; bind it into one closure up front
+        params, sql, probe = (self._sid,), self.INFO_SQL, self.VERSION_SQL
+        submit, show = self.loader.submit, self._show_info
+        def fetch(subjects):
+            # rows are grouped per widget as they stream in; no intermediate fetchall() list
+            notices, marks, attendance = [], [], []
+            # names of subjects created after `subjects` was built; handed back for the Tk thread to merge
+            added = {}
+            # the probe is read in the same snapshot as the rows, so _poll compares like with like
+            with READ_POOL.acquire() as conn, read_txn(conn):
+                def subject(subject_id):
+                    name = subjects.get(subject_id) or added.get(subject_id)
+                    if name is None:
+                        row = conn.execute("SELECT subject_name FROM subjects WHERE subject_id=?", (subject_id,)).fetchone()
+                        name = added[subject_id] = row[0] if row else "Unknown"
+                    return name
+                cur = conn.cursor()
+                cur.row_factory = None  # plain tuples: unpacked positionally below
+                versions = cur.execute(probe, params).fetchone()
+                cur.arraysize = 128
+                cur.execute(sql, params)
+                for kind, f1, f2, f3, f4 in stream(cur):
+                    if kind == "N":
+                        notices.append(f"{f3} - {f1}\n{f2}\n\n")
+                    elif kind == "M":
+                        marks.append((subject(f1), f2, f3, f4))
+                    else:
+                        attendance.append((f1, subject(f2), f3))
+            return versions, notices, marks, attendance, added
+        # the current map is read here, on the Tk thread, and passed to the worker
+        return lambda: submit(partial(fetch, self._subjects), show)
+
+    def _show_info(self, result):
+        self._versions, notices, marks, attendance, added = result
+        if added:
+            # a new dict rather than an in-place update: a queued fetch may still be reading the old one
+            self._subjects = {**self._subjects, **added}
+        self._refill(self.mtree, marks)
+        self._refill(self.atree, attendance)
+        # the notices text is replaced with one insert, so the widget lays out once
+        box = self.notice_box
+        box.config(state="normal")
+        box.delete("1.0","end")
+        box.insert("end", "".join(notices))
+        box.config(state="disabled")
+
+    def _refill(self, tree, rows):
+        # overwrite the existing items in place and only create/delete the difference in count;
+        # rows go straight to the Tcl treeview command with its constant words bound up front,
+        # skipping ttk's per-call option handling
+        item = partial(self.tk.call, tree._w, "item")
+        insert = partial(self.tk.call, tree._w, "insert", "", "end", "-values")
+        iids = tree.get_children()
+        for iid, vals in zip(iids, rows):
+            item(iid, "-values", vals)
+        if len(iids) > len(rows):
+            tree.delete(*iids[len(rows):])
+        for vals in rows[len(iids):]:
+            insert(vals)
+
+# ---------- Utility widgets ----------
+class DataTree(ttk.Treeview):
+    """Headings-only Treeview that keeps its items between refreshes.
+
+    sync() takes rows whose first key_cols values are the primary key (joined to form
+    the item iid) and only deletes, inserts or updates the items that actually changed.
+    """
+    def __init__(self, parent, columns, key_cols=1, **kw):
+        super().__init__(parent, columns=columns, show="headings", **kw)
+        for c in columns: self.heading(c, text=c.title())
+        self.key_cols = key_cols
+        self._rows = {}
+        self._order = []
+
+    def sync(self, rows):
+        # values are stringified once here (as ttk would per call) and handed to Tcl directly,
+        # skipping ttk.Treeview.insert/item option parsing for every row
+        new = {}
+        k = self.key_cols
+        for r in rows:
+            vals = tuple(map(str, r))
+            new[vals[0] if k == 1 else "-".join(vals[:k])] = vals
+        order = list(new)
+        stale = [iid for iid in self._order if iid not in new]
+        if stale:
+            self.delete(*stale)
+        insert = partial(self.tk.call, self._w, "insert", "", "end", "-id")
+        item = partial(self.tk.call, self._w, "item")
+        rows = self._rows
+        for iid, vals in new.items():
+            old = rows.get(iid)
+            if old is None:
+                insert(iid, "-values", vals)
+            elif old != vals:
+                item(iid, "-values", vals)
+        # kept items sit in their old order with new ones appended; reorder only if that is wrong
+        current = [iid for iid in self._order if iid in new] + [iid for iid in order if iid not in self._rows]
+        if current != order:
+            self.set_children("", *order)
+        self._rows, self._order = new, order
+
+    @property
+    def row_count(self):
+        return len(self._order)
 
 # ---------- Utility dialogs ----------
 class SimpleForm:
@@ -763,9 +1333,9 @@ class AssignDialog:
         self.top = tk.Toplevel(parent)
         self.top.title("Assign Teacher to Subject")
         ttk.Label(self.top, text="Select Teacher").grid(row=0, column=0, padx=6, pady=6)
-        self.tcb = ttk.Combobox(self.top, values=[f"{r['teacher_id']} - {r['name']}" for r in teachers]); self.tcb.grid(row=0, column=1)
+        self.tcb = ttk.Combobox(self.top, values=teachers); self.tcb.grid(row=0, column=1)
         ttk.Label(self.top, text="Select Subject").grid(row=1, column=0, padx=6, pady=6)
-        self.scb = ttk.Combobox(self.top, values=[f"{r['subject_id']} - {r['subject_name']}" for r in subjects]); self.scb.grid(row=1, column=1)
+        self.scb = ttk.Combobox(self.top, values=subjects); self.scb.grid(row=1, column=1)
         ttk.Button(self.top, text="Assign", command=self.assign).grid(row=2, column=0, columnspan=2, pady=8)
         self.result = None
 
@@ -780,14 +1350,8 @@ class CreateLoginDialog:
         self.top = tk.Toplevel(parent)
         self.top.title("Create Login")
         ttk.Label(self.top, text="Select " + role.title()).grid(row=0, column=0, padx=6, pady=6)
-        # rows may contain extra col for roll_no - map accordingly
-        display = []
-        for r in rows:
-            if 'roll_no' in r.keys():
-                display.append(f"{r[0]} - {r['name']} ({r['roll_no']})")
-            else:
-                display.append(f"{r[0]} - {r['name']}")
-        self.cb = ttk.Combobox(self.top, values=display); self.cb.grid(row=0, column=1)
+        # rows are the "id - name" labels built by AdminDashboard._choices
+        self.cb = ttk.Combobox(self.top, values=rows); self.cb.grid(row=0, column=1)
         ttk.Label(self.top, text="Username").grid(row=1, column=0, padx=6, pady=6)
         self.u = ttk.Entry(self.top); self.u.grid(row=1, column=1)
         ttk.Label(self.top, text="Password").grid(row=2, column=0, padx=6, pady=6)
@@ -0,0 +1,386 @@
+"""
+Tests for the non-GUI parts of erp.py: the Treeview diffing, bulk import, schema
+migrations and the shared SQL. They need no display; run them with
+
+    python -m unittest discover tests
+"""
+
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import erp
+
+
+class FakeTree:
+    """Just enough of ttk.Treeview for DataTree.sync: items in a dict, their order in a list."""
+    _w = ".tree"
+    sync = erp.DataTree.sync
+    row_count = erp.DataTree.row_count
+
+    def __init__(self, key_cols=1):
+        self.key_cols = key_cols
+        self._rows = {}
+        self._order = []
+        self.tk = self
+        self.items = {}
+        self.children = []
+        self.calls = []
+
+    def call(self, w, cmd, *args):
+        if cmd == "insert":  # "", "end", "-id", iid, "-values", vals
+            iid, vals = args[3], args[5]
+            self.children.append(iid)
+        else:  # item iid -values vals
+            iid, vals = args[0], args[2]
+        self.items[iid] = vals
+        self.calls.append((cmd, iid))
+
+    def delete(self, *iids):
+        for iid in iids:
+            del self.items[iid]
+            self.children.remove(iid)
+        self.calls.append(("delete",) + iids)
+
+    def set_children(self, parent, *iids):
+        self.children = list(iids)
+        self.calls.append(("move",))
+
+
+class DataTreeSyncTest(unittest.TestCase):
+    def test_first_sync_inserts_stringified_rows(self):
+        tree = FakeTree()
+        tree.sync([(1, "Ann", None), (2, "Bob", 7)])
+        self.assertEqual(tree.children, ["1", "2"])
+        self.assertEqual(tree.items["2"], ("2", "Bob", "7"))
+        self.assertEqual(tree.row_count, 2)
+
+    def test_unchanged_rows_make_no_calls(self):
+        tree = FakeTree()
+        tree.sync([(1, "Ann"), (2, "Bob")])
+        tree.calls.clear()
+        tree.sync([(1, "Ann"), (2, "Bob")])
+        self.assertEqual(tree.calls, [])
+
+    def test_only_the_difference_is_applied(self):
+        tree = FakeTree()
+        tree.sync([(1, "Ann"), (2, "Bob"), (3, "Cy")])
+        tree.calls.clear()
+        tree.sync([(1, "Ann"), (3, "Cyd"), (4, "Dee")])
+        self.assertEqual(tree.calls, [("delete", "2"), ("item", "3"), ("insert", "4")])
+        self.assertEqual(tree.children, ["1", "3", "4"])
+
+    def test_reorder_moves_children(self):
+        tree = FakeTree()
+        tree.sync([(1, "Ann"), (2, "Bob")])
+        tree.calls.clear()
+        tree.sync([(2, "Bob"), (1, "Ann")])
+        self.assertEqual(tree.calls, [("move",)])
+        self.assertEqual(tree.children, ["2", "1"])
+
+    def test_composite_key(self):
+        tree = FakeTree(key_cols=2)
+        tree.sync([(1, 2, "T", "S"), (1, 3, "T", "R")])
+        self.assertEqual(tree.children, ["1-2", "1-3"])
+
+
+class DbTestCase(unittest.TestCase):
+    """Points erp at a fresh database file in a temporary directory."""
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "erp.db")
+        for name, value in (("DB", self.path), ("_CONN", None), ("READ_POOL", erp.ConnectionPool())):
+            patcher = mock.patch.object(erp, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self._close)
+
+    def _close(self):
+        if erp._CONN is not None:
+            erp._CONN.close()
+        while not erp.READ_POOL._idle.empty():
+            erp.READ_POOL._idle.get().close()
+
+
+class ImportTest(DbTestCase):
+    def test_rows_are_trimmed_and_padded(self):
+        rows, missing = erp.read_import_rows(io.StringIO("Name,Roll No\n Ann , 1 \n\nBob,2,555,b@x,CS,extra\n"), 5, 2)
+        self.assertEqual(rows, [["Ann", "1", "", "", ""], ["Bob", "2", "555", "b@x", "CS"]])
+        self.assertEqual(missing, [])
+
+    def test_missing_required_fields_report_their_lines(self):
+        rows, missing = erp.read_import_rows(io.StringIO("Ann,1\n\n,3\nCy,\nDee\n"), 5, 2)
+        self.assertEqual(missing, [3, 4, 5])
+        _, missing = erp.read_import_rows(io.StringIO("Ann\n,555\n"), 3, 1)
+        self.assertEqual(missing, [2])
+
+    def test_header_is_only_skipped_on_the_first_line(self):
+        rows, _ = erp.read_import_rows(io.StringIO("Ann,1\nname,2\n"), 5, 2)
+        self.assertEqual([r[0] for r in rows], ["Ann", "name"])
+
+    def test_bulk_insert_spans_chunks(self):
+        erp.init_db()
+        rows = [(f"S{i}", str(i), "", "", "") for i in range(5)]
+        count = erp.bulk_insert("INSERT INTO students (name,roll_no,phone,email,course) VALUES (?,?,?,?,?)", rows, chunk=2)
+        self.assertEqual(count, 5)
+        self.assertEqual(erp.get_conn().execute("SELECT COUNT(*) FROM students").fetchone()[0], 5)
+
+    def test_bulk_insert_is_all_or_nothing(self):
+        erp.init_db()
+        # the duplicate roll number sits in the last chunk, after two chunks went through
+        rows = [(f"S{i}", str(i), "", "", "") for i in range(5)] + [("Dup", "0", "", "", "")]
+        with self.assertRaises(sqlite3.IntegrityError):
+            erp.bulk_insert("INSERT INTO students (name,roll_no,phone,email,course) VALUES (?,?,?,?,?)", rows, chunk=2)
+        self.assertEqual(erp.get_conn().execute("SELECT COUNT(*) FROM students").fetchone()[0], 0)
+
+
+# the schema as the first release created it: assignments with a rowid id, no unique attendance
+# key, no marks_latest
+BASELINE_DDL = """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin','teacher','student')),
+        reference_id INTEGER,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS teachers (
+        teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        phone TEXT,
+        email TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS students (
+        student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        roll_no TEXT UNIQUE NOT NULL,
+        phone TEXT,
+        email TEXT,
+        course TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS subjects (
+        subject_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        subject_name TEXT NOT NULL,
+        subject_code TEXT UNIQUE
+    );
+
+    CREATE TABLE IF NOT EXISTS assignments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        teacher_id INTEGER,
+        subject_id INTEGER,
+        FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id),
+        FOREIGN KEY(subject_id) REFERENCES subjects(subject_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS attendance (
+        attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER,
+        teacher_id INTEGER,
+        subject_id INTEGER,
+        date TEXT,
+        status TEXT CHECK(status IN ('Present','Absent')) DEFAULT 'Absent',
+        FOREIGN KEY(student_id) REFERENCES students(student_id),
+        FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id),
+        FOREIGN KEY(subject_id) REFERENCES subjects(subject_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS marks (
+        marks_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_id INTEGER,
+        subject_id INTEGER,
+        teacher_id INTEGER,
+        marks INTEGER,
+        exam_type TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(student_id) REFERENCES students(student_id),
+        FOREIGN KEY(subject_id) REFERENCES subjects(subject_id),
+        FOREIGN KEY(teacher_id) REFERENCES teachers(teacher_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS notices (
+        notice_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT,
+        content TEXT,
+        date TEXT
+    );
+"""
+
+
+class BaselineDbTestCase(DbTestCase):
+    """Starts from a database the first release would have left behind."""
+    def setUp(self):
+        super().setUp()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(BASELINE_DDL)
+        conn.executescript("""
+            INSERT INTO students (student_id, name, roll_no) VALUES (1, 'Ann', '1'), (2, 'Bob', '2');
+            INSERT INTO teachers (teacher_id, name) VALUES (1, 'Tess');
+            INSERT INTO subjects (subject_id, subject_name) VALUES (1, 'Math'), (2, 'Art');
+        """)
+        conn.commit()
+        self.old = conn
+        self.addCleanup(conn.close)
+
+
+class DedupeAttendanceTest(BaselineDbTestCase):
+    def test_older_duplicates_move_to_a_side_table(self):
+        self.old.executescript("""
+            INSERT INTO attendance (attendance_id, student_id, subject_id, date, status) VALUES
+                (1, 1, 1, '2024-01-01', 'Present'),
+                (2, 1, 1, '2024-01-01', 'Absent'),
+                (3, 1, 1, '2024-01-02', 'Present');
+        """)
+        warnings = erp.init_db()
+        self.assertTrue(any(w.startswith("1 older duplicate") for w in warnings))
+        conn = erp.get_conn()
+        self.assertEqual([r[0] for r in conn.execute("SELECT attendance_id FROM attendance ORDER BY 1")], [2, 3])
+        self.assertEqual([r[0] for r in conn.execute("SELECT attendance_id FROM attendance_duplicates")], [1])
+        # uq_att is in place now, so the next start has nothing to report
+        self.assertEqual(erp.init_db(), [])
+
+    def test_toggle_flips_one_row(self):
+        erp.init_db()
+        conn = erp.get_conn()
+        for _ in range(3):
+            conn.execute(erp.ATT_TOGGLE_SQL, (1, 1, 1, "2024-03-01"))
+        rows = conn.execute("SELECT status FROM attendance WHERE student_id=1").fetchall()
+        self.assertEqual([r[0] for r in rows], ["Present"])
+        conn.execute(erp.ATT_TOGGLE_SQL, (1, 1, 1, "2024-03-01"))
+        self.assertEqual(conn.execute("SELECT status FROM attendance").fetchone()[0], "Absent")
+
+
+class MigrateAssignmentsTest(BaselineDbTestCase):
+    def _pairs(self, table):
+        return erp.get_conn().execute(f"SELECT teacher_id, subject_id FROM {table} ORDER BY 1, 2").fetchall()
+
+    def test_rebuild_keeps_pairs_it_cannot_copy(self):
+        # a duplicate pair and one whose teacher is gone
+        self.old.execute("INSERT INTO assignments (teacher_id, subject_id) VALUES (1, 1), (1, 1), (1, 2), (9, 1)")
+        self.old.commit()
+        warnings = erp.init_db()
+        self.assertTrue(any("kept in the assignments_old table" in w for w in warnings))
+        self.assertEqual([tuple(r) for r in self._pairs("assignments")], [(1, 1), (1, 2)])
+        self.assertEqual([tuple(r) for r in self._pairs("assignments_old")], [(9, 1)])
+        cols = [c["name"] for c in erp.get_conn().execute("PRAGMA table_info(assignments)")]
+        self.assertEqual(cols, ["teacher_id", "subject_id"])
+
+    def test_a_leftover_assignments_old_is_finished(self):
+        self.old.execute("INSERT INTO assignments (teacher_id, subject_id) VALUES (1, 1), (9, 1)")
+        self.old.commit()
+        erp.init_db()
+        # the missing teacher turns up later; the next start copies the pair and drops the table
+        erp.get_conn().execute("INSERT INTO teachers (teacher_id, name) VALUES (9, 'Nine')")
+        erp.get_conn().commit()
+        self.assertEqual(erp.init_db(), [])
+        self.assertEqual([tuple(r) for r in self._pairs("assignments")], [(1, 1), (9, 1)])
+        self.assertIsNone(erp.get_conn().execute(
+            "SELECT 1 FROM sqlite_master WHERE name='assignments_old'").fetchone())
+
+    def test_a_failed_rebuild_leaves_the_old_table(self):
+        self.old.execute("INSERT INTO assignments (teacher_id, subject_id) VALUES (1, 1)")
+        self.old.commit()
+        conn = erp.get_conn()
+        with mock.patch.object(erp, "ASSIGNMENTS_DDL", "CREATE TABLE assignments (broken"):
+            with self.assertRaises(sqlite3.Error):
+                erp.migrate_assignments(conn)
+        cols = [c["name"] for c in conn.execute("PRAGMA table_info(assignments)")]
+        self.assertIn("id", cols)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM assignments").fetchone()[0], 1)
+
+
+class MarksLatestTest(BaselineDbTestCase):
+    def test_backfill_keeps_the_newest_mark(self):
+        # the newer mark has the lower id, so only created_at orders them correctly
+        self.old.execute("""INSERT INTO marks (marks_id, student_id, subject_id, marks, created_at) VALUES
+                            (1, 1, 1, 70, '2024-02-01'), (2, 1, 1, 40, '2024-01-01'), (3, 2, 1, 55, '2024-01-01')""")
+        self.old.commit()
+        erp.init_db()
+        latest = dict(((s, sub), m) for s, sub, m in erp.get_conn().execute("SELECT * FROM marks_latest"))
+        self.assertEqual(latest, {(1, 1): 70, (2, 1): 55})
+
+    def test_trigger_and_roster(self):
+        erp.init_db()
+        conn = erp.get_conn()
+        conn.execute("INSERT INTO marks (student_id, subject_id, marks) VALUES (1, 1, 30), (1, 1, 80)")
+        conn.execute(erp.ATT_TOGGLE_SQL, (1, 1, 1, "2024-03-01"))
+        conn.commit()
+        roster = [tuple(r) for r in conn.execute(erp.ROSTER_SQL, (1, "2024-03-01", 1))]
+        self.assertEqual(roster, [(1, "1", "Ann", "Present", 80), (2, "2", "Bob", "NotMarked", "")])
+
+
+class LikeContainsTest(unittest.TestCase):
+    def test_wildcards_match_literally(self):
+        conn = sqlite3.connect(":memory:")
+        self.addCleanup(conn.close)
+        conn.execute("CREATE TABLE users (username TEXT)")
+        conn.executemany("INSERT INTO users VALUES (?)", [("a_b",), ("axb",), ("50%off",), ("500ff",), ("c\\d",)])
+        def match(text):
+            return sorted(r[0] for r in conn.execute(
+                r"SELECT username FROM users WHERE username LIKE ? ESCAPE '\'", (erp.like_contains(text),)))
+        self.assertEqual(match("_"), ["a_b"])
+        self.assertEqual(match("0%"), ["50%off"])
+        self.assertEqual(match("\\"), ["c\\d"])
+        self.assertEqual(len(match("")), 5)
+
+
+class StudentDashboardSqlTest(DbTestCase):
+    def setUp(self):
+        super().setUp()
+        erp.init_db()
+        conn = erp.get_conn()
+        conn.executescript("""
+            INSERT INTO students (student_id, name, roll_no) VALUES (1, 'Ann', '1');
+            INSERT INTO teachers (teacher_id, name) VALUES (1, 'Tess');
+            INSERT INTO subjects (subject_id, subject_name) VALUES (1, 'Math');
+            INSERT INTO notices (title, content, date) VALUES ('Hi', 'Body', '2024-01-05');
+            INSERT INTO marks (student_id, subject_id, marks, exam_type, created_at) VALUES (1, 1, 50, 'mid', '2024-01-03');
+        """)
+        conn.executemany("INSERT INTO attendance (student_id, subject_id, date, status) VALUES (1, 1, ?, 'Present')",
+                         [(f"2024-02-{d:02}",) for d in range(1, 26)])
+        conn.commit()  # the pragma is a no-op inside a transaction
+        # a row of a subject that no longer exists
+        conn.execute("PRAGMA foreign_keys=OFF")
+        conn.execute("INSERT INTO attendance (student_id, subject_id, date, status) VALUES (1, 77, '2024-03-01', 'Absent')")
+        conn.commit()
+        conn.execute("PRAGMA foreign_keys=ON")
+
+    def test_info_sql_groups_by_kind(self):
+        rows = erp.fetch_rows(erp.StudentDashboard.INFO_SQL, (1,))
+        self.assertIs(type(rows[0]), tuple)
+        kinds = [r[0] for r in rows]
+        self.assertEqual(kinds, ["A"] * 20 + ["M", "N"])
+        # newest 20 of the subject's rows; the orphan row neither shows nor takes a slot
+        self.assertEqual(rows[0][1], "2024-02-25")
+        self.assertNotIn(77, [r[2] for r in rows if r[0] == "A"])
+
+    def test_version_probe_sees_a_toggle(self):
+        before = erp.fetch_rows(erp.StudentDashboard.VERSION_SQL, (1,))
+        conn = erp.get_conn()
+        conn.execute(erp.ATT_TOGGLE_SQL, (1, 1, 1, "2024-02-25"))
+        conn.commit()
+        self.assertNotEqual(erp.fetch_rows(erp.StudentDashboard.VERSION_SQL, (1,)), before)
+
+    def test_refresher_returns_new_subject_names(self):
+        dash = object.__new__(erp.StudentDashboard)
+        dash._sid = 1
+        dash._subjects = {}
+        results = []
+        dash.loader = mock.Mock(submit=lambda fetch, apply: results.append(fetch()))
+        dash._make_refresher()()
+        _, notices, marks, attendance, added = results[0]
+        self.assertEqual(notices, ["2024-01-05 - Hi\nBody\n\n"])
+        self.assertEqual(marks, [("Math", 50, "mid", "2024-01-03")])
+        self.assertEqual(attendance[0], ("2024-02-25", "Math", "Present"))
+        self.assertEqual(added, {1: "Math"})
+        # the map handed to the worker is only read, never filled in
+        self.assertEqual(dash._subjects, {})